@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import os
 from datetime import datetime, timezone
-from typing import Dict, List, Literal, Optional, Sequence
+from typing import List, Literal, Optional, Sequence
 
+import httpx
 from autogen_agentchat.agents import AssistantAgent, BaseChatAgent
 from autogen_agentchat.base import Response
 from autogen_agentchat.conditions import TextMentionTermination
@@ -12,16 +14,43 @@ from autogen_agentchat.messages import BaseChatMessage, StructuredMessage
 from autogen_agentchat.teams import DiGraphBuilder, GraphFlow
 from autogen_core import CancellationToken
 from autogen_ext.models.openai import OpenAIChatCompletionClient
+from openai import DefaultAsyncHttpxClient
 from pydantic import BaseModel
-from tools import fetch_page, google_search_many
+from tools import clean_str, fetch_page, google_search_many
 
 openai_api_key = os.getenv("OPENAI_API_KEY")
 if not openai_api_key:
     raise ValueError("OPENAI_API_KEY not found in environment variables")
 
-general_model = OpenAIChatCompletionClient(model="gpt-4o", api_key=openai_api_key)
-quick_model = OpenAIChatCompletionClient(model="gpt-4.1-nano", api_key=openai_api_key)
-coding_model = OpenAIChatCompletionClient(model="gpt-4", api_key=openai_api_key)
+GENERAL_MODEL = "gpt-4o"
+QUICK_MODEL = "gpt-4.1-nano"
+CODING_MODEL = "gpt-4"
+
+
+@functools.cache
+def _openai_http_client() -> httpx.AsyncClient:
+    # A single connection pool for every model client, so keep-alive
+    # connections to the OpenAI API are reused across agents and conversations.
+    return DefaultAsyncHttpxClient(
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=64)
+    )
+
+
+async def aclose_openai_http_client() -> None:
+    """Close the shared OpenAI HTTP client, if one was created."""
+
+    if _openai_http_client.cache_info().currsize:
+        await _openai_http_client().aclose()
+        _openai_http_client.cache_clear()
+        _model_client.cache_clear()
+
+
+@functools.cache
+def _model_client(model: str) -> OpenAIChatCompletionClient:
+    # Clients are created on first use and shared by every team afterwards.
+    return OpenAIChatCompletionClient(
+        model=model, api_key=openai_api_key, http_client=_openai_http_client()
+    )
 
 
 class SearchCandidateItem(BaseModel):
@@ -124,8 +153,8 @@ class TodayDateAgent(BaseChatAgent):
         self._last_announced_iso = iso_date
 
         human_readable = current_utc.strftime("%B %d, %Y")
-        structured_message = TodayDateMessage(
-            content=TodayDate(
+        structured_message = TodayDateMessage.model_construct(
+            content=TodayDate.model_construct(
                 iso_date=iso_date,
                 human_readable=human_readable,
                 timezone="UTC",
@@ -155,10 +184,11 @@ class GoogleSearchExecutorAgent(BaseChatAgent):
 
         queries: List[str] = []
         if isinstance(plan_message, ResearchPlanMessage):
-            for candidate in plan_message.content.queries:
-                candidate_query = candidate.strip()
-                if candidate_query:
-                    queries.append(candidate_query)
+            queries = [
+                candidate_query
+                for candidate in plan_message.content.queries
+                if (candidate_query := clean_str(candidate))
+            ]
 
         query_text = ", ".join(queries)
 
@@ -167,31 +197,22 @@ class GoogleSearchExecutorAgent(BaseChatAgent):
         if queries:
             raw_items = await google_search_many(queries, num_results=self._num_results)
 
-            for item in raw_items:
-                link = item.get("link")
-                title = item.get("title")
-                snippet = item.get("snippet")
-                favicon = item.get("favicon")
-
-                candidates.append(
-                    SearchCandidateItem(
-                        title=(
-                            title.strip()
-                            if isinstance(title, str) and title.strip()
-                            else link
-                        ),
-                        url=link,
-                        snippet=(snippet or "").strip() or "Snippet not available.",
-                        favicon=(
-                            favicon.strip()
-                            if isinstance(favicon, str) and favicon.strip()
-                            else None
-                        ),
-                    )
+            # Items come from google_search_many, which already normalizes every
+            # field, so skip pydantic validation on this trusted path.
+            candidates = [
+                SearchCandidateItem.model_construct(
+                    title=item["title"],
+                    url=item["link"],
+                    snippet=item["snippet"],
+                    favicon=item["favicon"],
                 )
+                for item in raw_items
+            ]
 
-        structured_message = SearchCandidatesMessage(
-            content=SearchCandidates(query=query_text, candidates=candidates),
+        structured_message = SearchCandidatesMessage.model_construct(
+            content=SearchCandidates.model_construct(
+                query=query_text, candidates=candidates
+            ),
             source=self.name,
         )
 
@@ -208,9 +229,11 @@ class PageFetchAgent(BaseChatAgent):
         *,
         description: str,
         max_chars: int = 4000,
+        max_concurrency: int = 8,
     ) -> None:
         super().__init__(name, description=description)
         self._max_chars = max_chars
+        self._fetch_semaphore = asyncio.Semaphore(max_concurrency)
 
     @property
     def produced_message_types(self) -> Sequence[type[BaseChatMessage]]:
@@ -223,105 +246,157 @@ class PageFetchAgent(BaseChatAgent):
             messages, RankedSearchResultsMessage
         )
 
-        results: List[SearchResultItem] = []
+        if ranked_message is None or not ranked_message.content.selections:
+            return Response(chat_message=self._result_message([]))
 
-        if ranked_message is not None:
-            selections = list(ranked_message.content.selections)
+        selections = list(ranked_message.content.selections)
 
-            async def fetch(
-                selection: RankedSearchResultItem,
-            ) -> tuple[RankedSearchResultItem, Dict[str, str]] | None:
-                if not selection.url:
-                    return None
-                try:
-                    payload = await fetch_page(
-                        url=selection.url, max_chars=self._max_chars
-                    )
-                    if payload is None:
-                        return None
-                except Exception:
+        # The ranker only honours rank_top_k, so apply the fetch budget here
+        # rather than downloading pages the plan never asked for.
+        plan_message = _latest_message_of_type(messages, ResearchPlanMessage)
+        if isinstance(plan_message, ResearchPlanMessage):
+            fetch_page_limit = plan_message.content.fetch_page_limit
+            if fetch_page_limit <= 0:
+                return Response(chat_message=self._result_message([]))
+            selections = selections[:fetch_page_limit]
+
+        async def fetch(
+            selection: RankedSearchResultItem,
+        ) -> SearchResultItem | None:
+            url = selection.url
+            if not url:
+                return None
+            try:
+                async with self._fetch_semaphore:
+                    payload = await fetch_page(url=url, max_chars=self._max_chars)
+                if payload is None:
                     return None
-
-                return selection, payload
-
-            payloads = await asyncio.gather(
-                *(fetch(selection) for selection in selections),
-                return_exceptions=False,
+            except Exception:
+                return None
+
+            # Build the item as soon as its page arrives so the final step is
+            # just filtering, instead of a second pass after the slowest fetch.
+            content = payload.get("content")
+            return SearchResultItem.model_construct(
+                title=payload.get("title") or url,
+                url=url,
+                favicon=selection.favicon or None,
+                snippet=selection.snippet or (content[:200].strip() if content else ""),
+                detail_summary=content,
             )
 
-            for item in payloads:
-                if item is None:
-                    continue
+        # gather keeps the ranker's order, which the report prompt relies on.
+        fetched = await asyncio.gather(
+            *(fetch(selection) for selection in selections),
+            return_exceptions=False,
+        )
+        results = [item for item in fetched if item is not None]
 
-                selection, payload = item
-                url = selection.url
-                title = payload.get("title") or url
-                content = payload.get("content")
-                snippet = selection.snippet or (
-                    content[:200].strip() if content else ""
-                )
-                favicon = selection.favicon or None
-
-                results.append(
-                    SearchResultItem(
-                        title=title,
-                        url=url,
-                        favicon=favicon,
-                        snippet=snippet,
-                        detail_summary=content,
-                    )
-                )
+        return Response(chat_message=self._result_message(results))
 
-        structured_message = SearchResultMessage(
-            content=SearchResult(results=results),
+    def _result_message(self, results: List[SearchResultItem]) -> SearchResultMessage:
+        return SearchResultMessage.model_construct(
+            content=SearchResult.model_construct(results=results),
             source=self.name,
         )
 
-        return Response(chat_message=structured_message)
-
     async def on_reset(self, cancellation_token: CancellationToken) -> None:
         return None
 
 
-def create_team():
-    router_system_message = """
-    You are the **routing planner** for a retrieval assistant.
-
-    Responsibilities:
-    - Inspect the latest user request and decide whether a QUICK_ANSWER, DEEP_DIVE, or CODING route is required.
-    - Emit a `RoutePlan` structured object with the following fields:
-      - `route`: `"quick_answer"` for lightweight responses, `"deep_dive"` when external research is required, or `"coding"` when hands-on programming help is needed.
-    - Prefer `"quick_answer"` when the request is straightforward, answerable from general knowledge, or when search would not add value.
-    - Prefer `"deep_dive"` for questions needing up-to-date facts, citations, or multiple corroborating sources.
-    - Prefer `"coding"` for programming tasks such as writing, debugging, or refactoring code where the assistant should produce or analyze code.
-    - Keep the plan concise and avoid free-form commentary outside of the structured object.
-    """
+# System prompts are kept byte-identical across turns and conversations so the
+# provider can serve them from its prompt cache. Never format per-turn values
+# (dates, user text) into them; those belong in the conversation messages,
+# e.g. TodayDateAgent's structured date message.
+ROUTER_SYSTEM_MESSAGE = """
+You are the **routing planner** for a retrieval assistant.
+
+Responsibilities:
+- Inspect the latest user request and decide whether a QUICK_ANSWER, DEEP_DIVE, or CODING route is required.
+- Emit a `RoutePlan` structured object with the following fields:
+  - `route`: `"quick_answer"` for lightweight responses, `"deep_dive"` when external research is required, or `"coding"` when hands-on programming help is needed.
+- Prefer `"quick_answer"` when the request is straightforward, answerable from general knowledge, or when search would not add value.
+- Prefer `"deep_dive"` for questions needing up-to-date facts, citations, or multiple corroborating sources.
+- Prefer `"coding"` for programming tasks such as writing, debugging, or refactoring code where the assistant should produce or analyze code.
+- Keep the plan concise and avoid free-form commentary outside of the structured object.
+"""
+
+
+RESEARCH_PLANNER_SYSTEM_MESSAGE = """
+You are the **research planner** for a retrieval assistant.
+
+- Read the conversation and craft a `ResearchPlan` structured object when a deep dive is requested.
+- Provide up to three high-quality Google search queries ordered by usefulness.
+- Set `rank_top_k` to the maximum number of search candidates that should be considered (1-5 is typical).
+- Set `fetch_page_limit` to the number of pages that should be fetched in detail (0-5, default to 3 when uncertain).
+- Stay within reasonable limits and avoid redundant or overly narrow queries.
+- Do not answer the user directly or add commentary outside of the structured object.
+"""
+
 
+RANKING_SYSTEM_MESSAGE = """
+You are a **search ranking analyst**.
+
+- Review the user's question and the `SearchCandidates` shared by the search specialist.
+- Select the strongest entries that align with the active `ResearchPlan` budget. Never exceed `rank_top_k`.
+- For each selection, provide a concise rationale in the `reason` field explaining why it is relevant.
+- Respond with a `RankedSearchResults` structured object containing a `selections` list.
+- Preserve the `title`, `url`, `snippet`, and `favicon` from the chosen candidates; do not fabricate information.
+- Do not call external tools or attempt to fetch page content.
+- Do not answer the user directly.
+"""
+
+
+QUICK_SYSTEM_MESSAGE = """
+You are a **rapid response assistant** trusted to deliver concise, high-quality answers.
+
+- Provide an accurate answer directly using your general knowledge and the conversation context.
+- If more research is required, acknowledge the limitation rather than fabricating details.
+- Keep the response focused and actionable. Include brief structure when it improves clarity.
+- When you finish, append the token `TERMINATE` on a new line to signal completion.
+"""
+
+
+CODING_SYSTEM_MESSAGE = """
+You are a **coding specialist** tasked with producing high-quality software solutions.
+
+- Read the conversation carefully and provide accurate, efficient code to satisfy the user's goal.
+- Offer brief explanations for non-trivial decisions and point out potential pitfalls or follow-up steps when appropriate.
+- Use Markdown code fences with language hints for all significant code snippets.
+- When you finish, append the token `TERMINATE` on a new line to signal completion.
+"""
+
+
+REPORT_SYSTEM_MESSAGE = """
+You are a helpful report-writing assistant.
+
+- Review the conversation, especially the fetched page content provided by the research specialist, and compose a comprehensive answer to the user.
+- Pay attention to the active `RoutePlan` to understand whether this is a quick answer or a deep dive and tailor the depth of your response accordingly.
+- Synthesize key findings, compare sources when helpful, and acknowledge any gaps or uncertainties.
+- Present the answer in clear sections or paragraphs as appropriate.
+- When you finish, append the token `TERMINATE` on a new line to signal completion.
+"""
+
+# Agents whose replies may end the run. The condition itself is stateful, so
+# create_team still builds a fresh instance per team.
+TERMINATION_SOURCES = ("report_agent", "quick_answer_agent", "coding_agent")
+
+
+def create_team():
     router_agent = AssistantAgent(
         name="router_agent",
-        model_client=quick_model,
+        model_client=_model_client(QUICK_MODEL),
         output_content_type=RoutePlan,
         description="Select the optimal workflow path",
-        system_message=router_system_message,
+        system_message=ROUTER_SYSTEM_MESSAGE,
     )
 
-    research_planner_system_message = """
-    You are the **research planner** for a retrieval assistant.
-
-    - Read the conversation and craft a `ResearchPlan` structured object when a deep dive is requested.
-    - Provide up to three high-quality Google search queries ordered by usefulness.
-    - Set `rank_top_k` to the maximum number of search candidates that should be considered (1-5 is typical).
-    - Set `fetch_page_limit` to the number of pages that should be fetched in detail (0-5, default to 3 when uncertain).
-    - Stay within reasonable limits and avoid redundant or overly narrow queries.
-    - Do not answer the user directly or add commentary outside of the structured object.
-    """
-
     research_planner_agent = AssistantAgent(
         name="research_planner_agent",
-        model_client=general_model,
+        model_client=_model_client(GENERAL_MODEL),
         output_content_type=ResearchPlan,
         description="Design the deep-dive search and retrieval plan",
-        system_message=research_planner_system_message,
+        system_message=RESEARCH_PLANNER_SYSTEM_MESSAGE,
     )
 
     google_search_agent = GoogleSearchExecutorAgent(
@@ -330,24 +405,12 @@ def create_team():
         num_results=5,
     )
 
-    ranking_system_message = """
-    You are a **search ranking analyst**.
-
-    - Review the user's question and the `SearchCandidates` shared by the search specialist.
-    - Select the strongest entries that align with the active `ResearchPlan` budget. Never exceed `rank_top_k`.
-    - For each selection, provide a concise rationale in the `reason` field explaining why it is relevant.
-    - Respond with a `RankedSearchResults` structured object containing a `selections` list.
-    - Preserve the `title`, `url`, `snippet`, and `favicon` from the chosen candidates; do not fabricate information.
-    - Do not call external tools or attempt to fetch page content.
-    - Do not answer the user directly.
-    """
-
     search_rank_agent = AssistantAgent(
         name="search_rank_agent",
-        model_client=quick_model,
+        model_client=_model_client(QUICK_MODEL),
         output_content_type=RankedSearchResults,
         description="Select the most relevant websites from the candidate list",
-        system_message=ranking_system_message,
+        system_message=RANKING_SYSTEM_MESSAGE,
     )
 
     page_fetch_agent = PageFetchAgent(
@@ -361,61 +424,31 @@ def create_team():
         description="Surface the current date information for deep dive workflows",
     )
 
-    quick_system_message = """
-    You are a **rapid response assistant** trusted to deliver concise, high-quality answers.
-
-    - Provide an accurate answer directly using your general knowledge and the conversation context.
-    - If more research is required, acknowledge the limitation rather than fabricating details.
-    - Keep the response focused and actionable. Include brief structure when it improves clarity.
-    - When you finish, append the token `TERMINATE` on a new line to signal completion.
-    """
-
     quick_answer_agent = AssistantAgent(
         name="quick_answer_agent",
-        model_client=quick_model,
+        model_client=_model_client(QUICK_MODEL),
         description="Deliver concise answers without external research",
-        system_message=quick_system_message,
+        system_message=QUICK_SYSTEM_MESSAGE,
         model_client_stream=True,
     )
 
-    coding_system_message = """
-    You are a **coding specialist** tasked with producing high-quality software solutions.
-
-    - Read the conversation carefully and provide accurate, efficient code to satisfy the user's goal.
-    - Offer brief explanations for non-trivial decisions and point out potential pitfalls or follow-up steps when appropriate.
-    - Use Markdown code fences with language hints for all significant code snippets.
-    - When you finish, append the token `TERMINATE` on a new line to signal completion.
-    """
-
     coding_agent = AssistantAgent(
         name="coding_agent",
-        model_client=coding_model,
+        model_client=_model_client(CODING_MODEL),
         description="Provide hands-on programming assistance",
-        system_message=coding_system_message,
+        system_message=CODING_SYSTEM_MESSAGE,
         model_client_stream=True,
     )
 
-    report_system_message = """
-    You are a helpful report-writing assistant.
-
-    - Review the conversation, especially the fetched page content provided by the research specialist, and compose a comprehensive answer to the user.
-    - Pay attention to the active `RoutePlan` to understand whether this is a quick answer or a deep dive and tailor the depth of your response accordingly.
-    - Synthesize key findings, compare sources when helpful, and acknowledge any gaps or uncertainties.
-    - Present the answer in clear sections or paragraphs as appropriate.
-    - When you finish, append the token `TERMINATE` on a new line to signal completion.
-    """
-
     report_agent = AssistantAgent(
         name="report_agent",
-        model_client=general_model,
+        model_client=_model_client(GENERAL_MODEL),
         description="Generate a summary report based on the research findings",
-        system_message=report_system_message,
+        system_message=REPORT_SYSTEM_MESSAGE,
         model_client_stream=True,
     )
 
-    termination = TextMentionTermination(
-        "TERMINATE", sources=["report_agent", "quick_answer_agent", "coding_agent"]
-    )
+    termination = TextMentionTermination("TERMINATE", sources=TERMINATION_SOURCES)
 
     builder = DiGraphBuilder()
     builder.add_node(router_agent)
@@ -1,6 +1,7 @@
-import json
+import asyncio
 import logging
 import os
+from contextlib import asynccontextmanager
 from typing import AsyncIterator
 
 from fastapi import FastAPI, HTTPException, Request
@@ -12,16 +13,28 @@ from message import (
     ChatDonePayload,
     ChatErrorEnvelope,
     ChatErrorPayload,
+    ChatSseEvent,
     ChatStreamEnvelope,
     SseEvent,
     SseMessageAdapter,
 )
-from workflow import ask
+from agent import aclose_openai_http_client
+from tools import aclose_http_client
+from workflow import ask, stop_conversation_sweeper
 
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    await stop_conversation_sweeper()
+    await aclose_http_client()
+    await aclose_openai_http_client()
+
+
+app = FastAPI(lifespan=lifespan)
 
 CHAT_STREAM_SCHEMA, CHAT_STREAM_DEFINITIONS = SseMessageAdapter.openapi_schema()
 
@@ -54,6 +67,36 @@ def custom_openapi() -> dict[str, object]:
 
 app.openapi = custom_openapi
 
+
+SSE_FRAME_PREFIXES = {
+    event: f"event: {event.value}\ndata: ".encode() for event in SseEvent
+}
+
+
+def format_sse(envelope: ChatSseEvent) -> bytes:
+    payload = SseMessageAdapter.dump_json(envelope)
+    return b"".join((SSE_FRAME_PREFIXES[envelope.event], payload, b"\n\n"))
+
+
+# The closing frame never varies, so it is serialized once at import time.
+DONE_FRAME = format_sse(
+    ChatDoneEnvelope.model_construct(
+        event=SseEvent.END,
+        data=ChatDonePayload.model_construct(message="[DONE]"),
+    )
+)
+
+
+async def _watch_disconnect(request: Request, disconnected: asyncio.Event) -> None:
+    # The query-string request has no body, so the next ASGI message is the
+    # client going away; waiting on it here keeps the send loop free of polls.
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            disconnected.set()
+            return
+
+
 cors_origin = os.getenv("CORS_ALLOW_ORIGIN")
 if cors_origin:
     app.add_middleware(
@@ -87,37 +130,31 @@ async def root() -> dict[str, str]:
 async def chat(
     request: Request, user_message: str, conversation_id: str | None = None
 ) -> StreamingResponse:
-    if not user_message.strip():
+    if not user_message or user_message.isspace():
         raise HTTPException(status_code=400, detail="question must not be empty")
 
-    async def event_stream() -> AsyncIterator[str]:
-        disconnected = False
+    async def event_stream() -> AsyncIterator[bytes]:
+        disconnected = asyncio.Event()
+        watcher = asyncio.create_task(_watch_disconnect(request, disconnected))
         try:
             async for event in ask(user_message, conversation_id=conversation_id):
-                if await request.is_disconnected():
-                    disconnected = True
+                if disconnected.is_set():
                     break
-                envelope = ChatStreamEnvelope(event=SseEvent.MESSAGE, data=event)
-                payload = json.dumps(envelope.model_dump())
-                yield f"event: {envelope.event.value}\n"
-                yield f"data: {payload}\n\n"
+                envelope = ChatStreamEnvelope.model_construct(
+                    event=SseEvent.MESSAGE, data=event
+                )
+                yield format_sse(envelope)
         except Exception as err:
             logger.exception("streaming /chat response failed: %s", err)
-            error_envelope = ChatErrorEnvelope(
+            error_envelope = ChatErrorEnvelope.model_construct(
                 event=SseEvent.ERROR,
-                data=ChatErrorPayload(error=str(err)),
+                data=ChatErrorPayload.model_construct(error=str(err)),
             )
-            error_payload = json.dumps(error_envelope.model_dump())
-            yield f"event: {error_envelope.event.value}\n"
-            yield f"data: {error_payload}\n\n"
-
-        if not disconnected:
-            done_envelope = ChatDoneEnvelope(
-                event=SseEvent.END,
-                data=ChatDonePayload(message="[DONE]"),
-            )
-            done_payload = json.dumps(done_envelope.model_dump())
-            yield f"event: {done_envelope.event.value}\n"
-            yield f"data: {done_payload}\n\n"
+            yield format_sse(error_envelope)
+        finally:
+            watcher.cancel()
+
+        if not disconnected.is_set():
+            yield DONE_FRAME
 
     return StreamingResponse(event_stream(), media_type="text/event-stream")
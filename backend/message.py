@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import Literal, Sequence, TypeAlias
+from typing import Annotated, Literal, Sequence, TypeAlias
 
-from pydantic import BaseModel, TypeAdapter
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class Page(BaseModel):
@@ -84,7 +84,7 @@ class AnswerMessage(BaseStreamMessage):
     citations: Sequence[Page] | None = None
 
 
-StreamMessage: TypeAlias = (
+StreamMessage: TypeAlias = Annotated[
     TurnStartMessage
     | StepStartMessage
     | StepStatusMessage
@@ -94,8 +94,9 @@ StreamMessage: TypeAlias = (
     | StepAnswerStartMessage
     | StepAnswerDeltaMessage
     | StepAnswerEndMessage
-    | AnswerMessage
-)
+    | AnswerMessage,
+    Field(discriminator="type"),
+]
 
 StreamMessageAdapter = TypeAdapter(StreamMessage)
 
@@ -152,11 +153,11 @@ class SseMessageAdapter:
     _stream_adapter = StreamMessageAdapter
     _sse_adapter = ChatSseEventAdapter
 
-    @classmethod
-    def dump_python(cls, message: StreamMessage, **kwargs) -> dict[str, object]:
-        """Serialize a streamed chat message into plain Python primitives."""
-
-        return cls._stream_adapter.dump_python(message, **kwargs)
+    # Bound adapter methods, so per-event calls skip a classmethod frame and the
+    # attribute chain. dump_python turns a StreamMessage into plain primitives;
+    # dump_json turns a ChatSseEvent envelope into JSON bytes.
+    dump_python = staticmethod(StreamMessageAdapter.dump_python)
+    dump_json = staticmethod(ChatSseEventAdapter.dump_json)
 
     @classmethod
     def openapi_schema(cls) -> tuple[dict[str, object], dict[str, object]]:
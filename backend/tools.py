@@ -1,6 +1,10 @@
 import asyncio
+import functools
 import os
-from urllib.parse import urlparse
+import re
+from collections import OrderedDict
+from collections.abc import Iterable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import httpx
 from bs4 import BeautifulSoup
@@ -11,41 +15,107 @@ if not serper_api_key:
     raise ValueError("SERPER_API_KEY not found in environment variables")
 
 
-def _build_favicon_url(link: str) -> str | None:
-    """Construct a Google favicon service URL for the link's domain."""
+@functools.cache
+def _http_client() -> httpx.AsyncClient:
+    # One pool for Serper searches and page fetches, so keep-alive connections
+    # and TLS sessions survive across calls instead of being rebuilt each time.
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(4.0),
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    )
+
+
+async def aclose_http_client() -> None:
+    """Close the shared HTTP client, if one was created."""
+
+    if _http_client.cache_info().currsize:
+        await _http_client().aclose()
+        _http_client.cache_clear()
+
+
+def clean_str(value: object) -> str | None:
+    """Return the stripped string, or None for non-strings and blank values."""
+
+    if isinstance(value, str):
+        return value.strip() or None
+    return None
+
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _canonical_url(link: str) -> str:
+    """Normalize a URL so trivial variants of the same page compare equal.
+
+    Lowercases scheme and host, drops default ports, fragments, `utm_*`
+    tracking parameters and trailing slashes. Only used as a dedupe key."""
 
     try:
-        parsed = urlparse(link)
+        parts = urlsplit(link)
+        port = parts.port
     except ValueError:
+        return link
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if port is not None and port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    query = urlencode(
+        [
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith("utm_")
+        ]
+    )
+    return urlunsplit((scheme, host, parts.path.rstrip("/"), query, ""))
+
+
+def _build_favicon_url(link: str) -> str | None:
+    """Construct a Google favicon service URL for the link's domain."""
+
+    # Only scheme://netloc is needed, so scan for it directly rather than
+    # running the full urlparse machinery for every search result.
+    scheme, separator, rest = link.partition("://")
+    if not separator or not scheme:
         return None
 
-    if not parsed.scheme or not parsed.netloc:
+    end = len(rest)
+    for delimiter in "/?#":
+        index = rest.find(delimiter, 0, end)
+        if index != -1:
+            end = index
+    netloc = rest[:end]
+    if not netloc:
         return None
 
-    domain_url = f"{parsed.scheme}://{parsed.netloc}"
-    return f"https://www.google.com/s2/favicons?sz=64&domain_url={domain_url}"
+    return _favicon_for_origin(scheme, netloc)
+
+
+@functools.lru_cache(maxsize=512)
+def _favicon_for_origin(scheme: str, netloc: str) -> str:
+    # Results cluster on a handful of domains, so reuse the formatted URL.
+    return f"https://www.google.com/s2/favicons?sz=64&domain_url={scheme}://{netloc}"
 
 
 async def google_search(query: str, num_results: int) -> list:
-    timeout = httpx.Timeout(4.0)
     headers = {
         "X-API-KEY": serper_api_key,
         "Content-Type": "application/json",
     }
     requested = min(num_results, 20)
 
-    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-        try:
-            response = await client.post(
-                "https://google.serper.dev/search",
-                headers=headers,
-                json={"q": query, "num": requested},
-            )
-            response.raise_for_status()
-        except httpx.HTTPError as exc:
-            raise ValueError(f"Serper API request failed: {exc}") from exc
+    try:
+        response = await _http_client().post(
+            "https://google.serper.dev/search",
+            headers=headers,
+            json={"q": query, "num": requested},
+        )
+        response.raise_for_status()
+    except httpx.HTTPError as exc:
+        raise ValueError(f"Serper API request failed: {exc}") from exc
 
-        payload = response.json()
+    payload = response.json()
 
     organic_results = payload.get("organic", []) or []
     news_results = payload.get("news", []) or []
@@ -79,7 +149,7 @@ async def google_search_many(
     """Run multiple Serper searches concurrently and return de-duplicated results.
 
     - Executes searches for all non-empty queries concurrently.
-    - Normalizes and de-duplicates results by URL (first occurrence wins).
+    - Normalizes and de-duplicates results by canonical URL (first occurrence wins).
     - Each item mirrors `google_search`'s structure: keys `title`, `link`, `snippet`, `favicon`.
     """
 
@@ -98,69 +168,122 @@ async def google_search_many(
 
     results_lists = await asyncio.gather(*(_run(q) for q in normalized_queries))
 
-    # Flatten and de-duplicate by normalized URL
-    seen_urls: set[str] = set()
-    aggregated: list[dict] = []
+    # Flatten and de-duplicate by canonical URL; the first variant seen is kept
+    # and the insertion-ordered dict doubles as the seen set.
+    aggregated: dict[str, dict] = {}
     for items in results_lists:
         for item in items:
             link = item.get("link")
             if not isinstance(link, str):
                 continue
             url = link.strip()
-            if not url or url in seen_urls:
+            if not url:
+                continue
+            key = _canonical_url(url)
+            if key in aggregated:
                 continue
 
-            title = item.get("title")
-            snippet = item.get("snippet")
-            favicon = item.get("favicon")
+            aggregated[key] = {
+                "title": clean_str(item.get("title")) or url,
+                "link": url,
+                "snippet": clean_str(item.get("snippet")) or "Snippet not available.",
+                "favicon": clean_str(item.get("favicon")) or _build_favicon_url(url),
+            }
 
-            aggregated.append(
-                {
-                    "title": (title.strip() if isinstance(title, str) else url) or url,
-                    "link": url,
-                    "snippet": (snippet or "").strip() or "Snippet not available.",
-                    "favicon": (favicon.strip() if isinstance(favicon, str) else None)
-                    or _build_favicon_url(url),
-                }
-            )
-            seen_urls.add(url)
+    return list(aggregated.values())
 
-    return aggregated
 
+_WORD_RE = re.compile(r"\S+")
 
-async def fetch_page(url: str, max_chars: int) -> dict[str, str] | None:
-    """Fetch and trim textual content from a single web page.
 
-    Returns None when the request cannot be completed successfully."""
+def _trim_words(strings: Iterable[str], max_chars: int) -> str:
+    """Join whole words from `strings` with single spaces, up to `max_chars`.
 
-    timeout = httpx.Timeout(4.0)
+    Words are pulled lazily, so only the start of a large page is scanned."""
 
-    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-        try:
-            response = await client.get(url)
-            response.raise_for_status()
-        except httpx.HTTPError:
-            return None
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    text = soup.get_text(separator=" ", strip=True)
-    words = text.split()
     content_parts: list[str] = []
     current_len = 0
 
-    for word in words:
-        additional = len(word) + (1 if content_parts else 0)
-        if current_len + additional > max_chars:
-            break
-        content_parts.append(word)
-        current_len += additional
+    for string in strings:
+        for match in _WORD_RE.finditer(string):
+            word = match.group()
+            additional = len(word) + (1 if content_parts else 0)
+            if current_len + additional > max_chars:
+                return " ".join(content_parts)
+            content_parts.append(word)
+            current_len += additional
+
+    return " ".join(content_parts)
+
+
+PAGE_CACHE_SIZE = 256
+
+# (url, max_chars) -> (etag, last_modified, page), most recently used last.
+# Only pages that carry a validator are kept, so every hit is revalidated with
+# a conditional request instead of being served stale.
+_page_cache: OrderedDict[
+    tuple[str, int], tuple[str | None, str | None, dict[str, str]]
+] = OrderedDict()
+
+
+def _remember_page(
+    cache_key: tuple[str, int],
+    entry: tuple[str | None, str | None, dict[str, str]],
+) -> None:
+    # Concurrent fetches may have evicted the key meanwhile, so (re)insert it.
+    _page_cache[cache_key] = entry
+    _page_cache.move_to_end(cache_key)
+    if len(_page_cache) > PAGE_CACHE_SIZE:
+        _page_cache.popitem(last=False)
 
-    trimmed_content = " ".join(content_parts)
+
+async def fetch_page(url: str, max_chars: int) -> dict[str, str] | None:
+    """Fetch and trim textual content from a single web page.
+
+    Returns None when the request cannot be completed successfully."""
+
+    cache_key = (url, max_chars)
+    cached = _page_cache.get(cache_key)
+    headers: dict[str, str] = {}
+    if cached is not None:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    try:
+        response = await _http_client().get(url, headers=headers)
+        # raise_for_status() treats 304 as an error, so revalidation hits have
+        # to be handled before it runs.
+        if cached is not None and response.status_code == httpx.codes.NOT_MODIFIED:
+            _remember_page(cache_key, cached)
+            return cached[2]
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return None
+
+    # lxml's C parser builds the tree far faster than the pure-Python
+    # html.parser. Parsing raw bytes skips a full str decode; the header charset
+    # still wins when present, otherwise the document's own declaration does.
+    soup = BeautifulSoup(
+        response.content, "lxml", from_encoding=response.charset_encoding
+    )
+    trimmed_content = _trim_words(soup.stripped_strings, max_chars)
     title_tag = soup.find("title")
     page_title = title_tag.text.strip() if title_tag and title_tag.text else url
 
-    return {
+    page = {
         "url": url,
         "title": page_title,
         "content": trimmed_content,
     }
+
+    etag = response.headers.get("etag")
+    last_modified = response.headers.get("last-modified")
+    if etag or last_modified:
+        _remember_page(cache_key, (etag, last_modified, page))
+    else:
+        _page_cache.pop(cache_key, None)
+
+    return page
@@ -1,12 +1,28 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import functools
+import io
+import os
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 from uuid import uuid4
 
 from agent import (
+    TERMINATION_SOURCES,
     RankedSearchResults,
     RankedSearchResultsMessage,
     ResearchPlan,
@@ -40,40 +56,197 @@ from message import (
     StreamMessage,
     TurnStartMessage,
 )
-from pydantic import ValidationError
 
-HandlerReturn = Optional[
-    StreamMessage | List[StreamMessage] | Tuple[StreamMessage, ...]
-]
+# Most events (notably token chunks from non-answering agents) produce nothing;
+# they all share this empty tuple instead of allocating a fresh list each.
+NO_MESSAGES: Tuple[StreamMessage, ...] = ()
 
+# Handlers always return a sequence of messages, NO_MESSAGES when idle.
+HandlerReturn = Sequence[StreamMessage]
 
-@dataclass
+# Per-URL state bits tracked by EventProcessor for the active research plan.
+URL_RANKED = 1
+URL_FETCH_ANNOUNCED = 2
+URL_FETCHED = 4
+
+# Streamed answer tokens are coalesced into a single delta until either limit
+# is reached, so the client is not sent one SSE event per model token. Buffered
+# text is flushed at the interval deadline even when no further token arrives.
+ANSWER_DELTA_FLUSH_CHARS = 64
+ANSWER_DELTA_FLUSH_INTERVAL = 0.01
+
+TERMINATION_TOKEN = "TERMINATE"
+
+# Number of agent events buffered between the team stream and the processor.
+STREAM_BUFFER_SIZE = 32
+
+# Agents whose streamed output forms the answer until a route narrows it down
+# (see ROUTE_CONFIGS). Shared frozensets, so no turn builds a set of its own.
+ALL_ANSWER_SOURCES = frozenset(TERMINATION_SOURCES)
+
+# Step messages with fixed content are built once and shared by every turn;
+# they are only ever serialized, never mutated.
+PLANNING_STEP_START = StepStartMessage.model_construct(
+    type="step.start",
+    title="Planning the appropriate route",
+    description="Evaluating best workflow for this request.",
+)
+CODING_STEP_START = StepStartMessage.model_construct(
+    type="step.start",
+    title="Coding agent thinking",
+    description="Coding agent is thinking through the implementation details.",
+)
+CODING_STEP_END = StepEndMessage.model_construct(
+    type="step.end",
+    title="Coding agent thinking",
+    description="Coding approach finalized – composing response.",
+)
+RANK_STEP_START = StepStartMessage.model_construct(
+    type="step.start",
+    title="Ranking candidate sources",
+    description="Prioritizing pages to review in depth.",
+)
+ANSWER_STEP_END = StepAnswerEndMessage.model_construct(
+    type="step.answer.end",
+    title="Answering the question",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class RouteConfig:
+    answer_sources: FrozenSet[str]
+    planning_step_end: StepEndMessage
+    answer_step_description: str
+    opens_coding_step: bool = False
+
+
+def _planning_step_end(description: str) -> StepEndMessage:
+    return StepEndMessage.model_construct(
+        type="step.end",
+        title="Planning the appropriate route",
+        description=description,
+    )
+
+
+# Everything a route decision changes, prebuilt per route; unknown routes fall
+# back to deep-dive research.
+ROUTE_CONFIGS: Dict[str, RouteConfig] = {
+    "quick_answer": RouteConfig(
+        answer_sources=frozenset({"quick_answer_agent"}),
+        planning_step_end=_planning_step_end(
+            "Quick answer selected – responding directly using existing knowledge."
+        ),
+        answer_step_description="Drafting a direct reply without additional research.",
+    ),
+    "coding": RouteConfig(
+        answer_sources=frozenset({"coding_agent"}),
+        planning_step_end=_planning_step_end(
+            "Coding support engaged – focusing on implementation guidance."
+        ),
+        answer_step_description="Producing code-focused explanations and solutions.",
+        opens_coding_step=True,
+    ),
+    "deep_dive": RouteConfig(
+        answer_sources=frozenset({"report_agent"}),
+        planning_step_end=_planning_step_end(
+            "Deep dive research selected – gathering sources for a comprehensive response."
+        ),
+        answer_step_description="Synthesizing findings from external research.",
+    ),
+}
+
+
+@dataclass(slots=True)
 class ConversationState:
     team: GraphFlow
     lock: asyncio.Lock
     last_used: datetime
 
 
-_conversation_states: Dict[str, ConversationState] = {}
+# Ordered by recency of use so the least recently used conversations can be
+# evicted once the cache is full.
+_conversation_states: "OrderedDict[str, ConversationState]" = OrderedDict()
 CONVERSATION_TTL = timedelta(days=1)
+MAX_CONVERSATIONS = 1024
+CONVERSATION_SWEEP_INTERVAL = 60.0
+
+# Caps how many chat turns talk to the model provider at once; further turns
+# wait for a slot instead of piling onto the provider's rate limits. A slot is
+# only taken once the turn holds its conversation lock, so turns queued behind
+# the same conversation do not occupy slots other conversations could use.
+_turn_slots = asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
+
+_sweeper_task: Optional[asyncio.Task[None]] = None
 
 
 def _purge_expired_conversations(now: datetime) -> None:
     expiration_threshold = now - CONVERSATION_TTL
     expired_conv_ids: List[str] = []
-    for conv_id, state in list(_conversation_states.items()):
+    # last_used is only ever stamped together with a move to the end (see
+    # _touch_conversation), so idle states are ordered by it and the scan can
+    # stop at the first one that has not expired yet.
+    for conv_id, state in _conversation_states.items():
         if state.lock.locked():
             continue
-        if state.last_used < expiration_threshold:
-            expired_conv_ids.append(conv_id)
+        if state.last_used >= expiration_threshold:
+            break
+        expired_conv_ids.append(conv_id)
 
     for conv_id in expired_conv_ids:
         _conversation_states.pop(conv_id, None)
 
 
+async def _sweep_expired_conversations() -> None:
+    while True:
+        await asyncio.sleep(CONVERSATION_SWEEP_INTERVAL)
+        _purge_expired_conversations(datetime.now(timezone.utc))
+
+
+def _ensure_sweeper_running() -> None:
+    # Expiry runs in one background task instead of scanning every state on
+    # each request; started lazily because it needs the running loop.
+    global _sweeper_task
+    if _sweeper_task is None or _sweeper_task.done():
+        _sweeper_task = asyncio.create_task(_sweep_expired_conversations())
+
+
+async def stop_conversation_sweeper() -> None:
+    """Cancel the background expiry task, if it was started."""
+
+    global _sweeper_task
+    if _sweeper_task is None:
+        return
+    _sweeper_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await _sweeper_task
+    _sweeper_task = None
+
+
+def _evict_least_recently_used(keep_conv_id: str) -> None:
+    if len(_conversation_states) <= MAX_CONVERSATIONS:
+        return
+
+    for conv_id, state in list(_conversation_states.items()):
+        if len(_conversation_states) <= MAX_CONVERSATIONS:
+            break
+        if conv_id == keep_conv_id or state.lock.locked():
+            continue
+        del _conversation_states[conv_id]
+
+
+def _touch_conversation(conv_id: str, state: ConversationState) -> None:
+    # Stamping and reordering happen together so that iteration order always
+    # matches last_used, which the expiry sweep relies on.
+    state.last_used = datetime.now(timezone.utc)
+    if conv_id in _conversation_states:
+        _conversation_states.move_to_end(conv_id)
+
+
 class ConversationSession:
     """Manage conversation lookup, creation, and locking."""
 
+    __slots__ = ("_requested_id", "conversation_id", "state")
+
     def __init__(self, conversation_id: Optional[str]) -> None:
         normalized = (
             conversation_id.strip()
@@ -86,7 +259,7 @@ class ConversationSession:
 
     async def __aenter__(self) -> "ConversationSession":
         now = datetime.now(timezone.utc)
-        _purge_expired_conversations(now)
+        _ensure_sweeper_running()
         conv_id = self._requested_id or uuid4().hex
         state = _conversation_states.get(conv_id)
         if state is None:
@@ -94,114 +267,173 @@ class ConversationSession:
                 team=create_team(), lock=asyncio.Lock(), last_used=now
             )
             _conversation_states[conv_id] = state
-        else:
-            state.last_used = now
-
-        if state.lock.locked():
-            raise RuntimeError(
-                f"conversation '{conv_id}' is already processing another request"
-            )
+            _evict_least_recently_used(conv_id)
 
+        # A GraphFlow can only run one turn at a time, so further requests for
+        # the same conversation wait their turn (asyncio.Lock is FIFO) rather
+        # than failing. Cross-conversation load is capped by _turn_slots.
         await state.lock.acquire()
-        state.last_used = now
+        try:
+            await _turn_slots.acquire()
+        except BaseException:
+            state.lock.release()
+            raise
+        # Touched once the turn actually starts; queued turns may have waited.
+        _touch_conversation(conv_id, state)
         self.conversation_id = conv_id
         self.state = state
         return self
 
     async def __aexit__(self, exc_type, exc, tb) -> None:
         if self.state is not None:
-            self.state.last_used = datetime.now(timezone.utc)
+            _touch_conversation(self.conversation_id, self.state)
+            _turn_slots.release()
             self.state.lock.release()
 
 
 class EventProcessor:
-    """Dispatch agent events to dedicated handlers for streaming output."""
-
-    def __init__(self, stream: AsyncIterator[object], conversation_id: str) -> None:
+    """Dispatch agent events to dedicated handlers for streaming output.
+
+    Stream messages are built with ``model_construct``: every field is produced
+    by this class from already-typed values, so pydantic validation is skipped.
+    """
+
+    # One processor per turn touches its state on every streamed token, so the
+    # attributes live in fixed slots instead of a per-instance __dict__.
+    __slots__ = (
+        "_planning_step_open",
+        "_search_step_open",
+        "_rank_step_started",
+        "_rank_step_completed",
+        "_url_flags",
+        "_answer_buffer",
+        "_pending_delta",
+        "_pending_delta_len",
+        "_last_delta_flush",
+        "_flush_timer",
+        "_request_flush",
+        "_fallback_buffer",
+        "_latest_citation_pages",
+        "_active_research_plan",
+        "_answer_step_description",
+        "_answer_step_started",
+        "_answer_step_completed",
+        "_coding_step_open",
+        "_final_agent_sources",
+        "finished",
+        "_stream",
+        "_conversation_id",
+        "_direct_handlers",
+        "_structured_handlers",
+        "_direct_handler_cache",
+        "_structured_handler_cache",
+    )
+
+    def __init__(
+        self,
+        stream: AsyncIterator[object],
+        conversation_id: str,
+        request_flush: Optional[Callable[[], None]] = None,
+    ) -> None:
         self._planning_step_open = False
         self._search_step_open = False
 
         self._rank_step_started = False
         self._rank_step_completed = False
-        self._fetch_announced: Set[str] = set()
-        self._answer_chunks: List[str] = []
-        self._fallback_segments: List[str] = []
+        self._url_flags: Dict[str, int] = {}
+        # Answer text accumulates in growable buffers rather than lists of
+        # per-token strings, so finalizing a long answer is a single copy.
+        self._answer_buffer = io.StringIO()
+        self._pending_delta: List[str] = []
+        self._pending_delta_len = 0
+        self._last_delta_flush = 0.0
+        # Armed once per pending delta; when it fires, request_flush makes the
+        # stream yield FLUSH_DUE so buffered text goes out even if the model
+        # stalls. Without request_flush, deltas only flush as chunks arrive.
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._request_flush = request_flush
+        self._fallback_buffer = io.StringIO()
         self._latest_citation_pages: List[Page] = []
         self._active_research_plan: Optional[ResearchPlan] = None
         self._answer_step_description: Optional[str] = None
         self._answer_step_started = False
         self._answer_step_completed = False
         self._coding_step_open = False
-        self._final_agent_sources: Set[str] = {
-            "report_agent",
-            "quick_answer_agent",
-            "coding_agent",
-        }
+        self._final_agent_sources: FrozenSet[str] = ALL_ANSWER_SOURCES
         self.finished = False
         self._stream = stream
         self._conversation_id = conversation_id
 
-    def set_planning_active(self, active: bool) -> None:
-        self._planning_step_open = active
+        # Handler tables are built once per processor; resolved lookups are
+        # cached per concrete type so the MRO walk only happens on first sight.
+        self._direct_handlers: Dict[type, Callable[[object], HandlerReturn]] = {
+            BaseTextChatMessage: self.handle_BaseTextChatMessage,
+            TaskResult: self.handle_TaskResult,
+        }
+        self._structured_handlers: Dict[
+            type, Callable[[StructuredMessage], HandlerReturn]
+        ] = {
+            RoutePlan: self.handle_RoutePlanMessage,
+            ResearchPlan: self.handle_ResearchPlanMessage,
+            SearchCandidates: self.handle_SearchCandidatesMessage,
+            RankedSearchResults: self.handle_RankedSearchResultsMessage,
+            SearchResult: self.handle_SearchResultMessage,
+        }
+        self._direct_handler_cache: Dict[
+            type, Optional[Callable[[object], HandlerReturn]]
+        ] = {}
+        self._structured_handler_cache: Dict[
+            type, Optional[Callable[[object], HandlerReturn]]
+        ] = {}
 
     async def run(self) -> AsyncIterator[StreamMessage]:
-        yield TurnStartMessage(
+        yield TurnStartMessage.model_construct(
             type="turn.start",
             conversation_id=self._conversation_id,
         )
 
-        self.set_planning_active(True)
+        self._planning_step_open = True
 
-        yield StepStartMessage(
-            type="step.start",
-            title="Planning the appropriate route",
-            description="Evaluating best workflow for this request.",
-        )
+        yield PLANNING_STEP_START
 
-        async for event in self._stream:
-            messages = await self.process_event(event)
-            for message in messages:
-                yield message
-            if self.finished:
-                break
+        process_event = self.process_event
+        try:
+            async for event in self._stream:
+                if event is FLUSH_DUE:
+                    messages = self._flush_answer_delta()
+                else:
+                    messages = process_event(event)
+                for message in messages:
+                    yield message
+                if self.finished:
+                    break
+        finally:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+
+    def process_event(self, event: object) -> Sequence[StreamMessage]:
+        # Handlers are synchronous by contract; nothing here needs to await.
+        if isinstance(event, ModelClientStreamingChunkEvent):
+            # Token chunks dominate the stream; skip table dispatch for them, and
+            # drop chunks from non-answering agents without a handler call. This
+            # is the only route to the chunk handler, which relies on the check.
+            if event.source not in self._final_agent_sources:
+                return NO_MESSAGES
+            return self.handle_ModelClientStreamingChunkEvent(event)
 
-    async def process_event(self, event: object) -> List[StreamMessage]:
         resolved = self._resolve_handler(event)
         if resolved is None:
-            return []
+            return NO_MESSAGES
 
         handler, payload = resolved
-
-        result = handler(payload)
-        if asyncio.iscoroutine(result):
-            result = await result
-        if result is None:
-            return []
-        if isinstance(result, list):
-            return result
-        if isinstance(result, tuple):
-            return list(result)
-        return [result]
+        return handler(payload)
 
     def _resolve_handler(
         self, event: object
     ) -> Optional[Tuple[Callable[[object], HandlerReturn], object]]:
-        direct_handler_map: Dict[type, Callable[[object], HandlerReturn]] = {
-            ModelClientStreamingChunkEvent: self.handle_ModelClientStreamingChunkEvent,
-            BaseTextChatMessage: self.handle_BaseTextChatMessage,
-            TaskResult: self.handle_TaskResult,
-        }
-        structured_handler_map: Dict[
-            type, Callable[[StructuredMessage], HandlerReturn]
-        ] = {
-            RoutePlan: self.handle_RoutePlanMessage,
-            ResearchPlan: self.handle_ResearchPlanMessage,
-            SearchCandidates: self.handle_SearchCandidatesMessage,
-            RankedSearchResults: self.handle_RankedSearchResultsMessage,
-            SearchResult: self.handle_SearchResultMessage,
-        }
-
-        handler = self._find_handler_for_type(type(event), direct_handler_map)
+        handler = self._find_handler_for_type(
+            type(event), self._direct_handlers, self._direct_handler_cache
+        )
         if handler is not None:
             return handler, event
 
@@ -209,70 +441,48 @@ class EventProcessor:
             content = getattr(event, "content", None)
             if content is not None:
                 content_handler = self._find_handler_for_type(
-                    type(content), structured_handler_map
+                    type(content),
+                    self._structured_handlers,
+                    self._structured_handler_cache,
                 )
                 if content_handler is not None:
                     return content_handler, event
 
         return None
 
+    @staticmethod
     def _find_handler_for_type(
-        self,
         event_type: type,
         mapping: Dict[type, Callable[[object], HandlerReturn]],
+        cache: Dict[type, Optional[Callable[[object], HandlerReturn]]],
     ) -> Optional[Callable[[object], HandlerReturn]]:
+        if event_type in cache:
+            return cache[event_type]
+
+        resolved: Optional[Callable[[object], HandlerReturn]] = None
         for cls in event_type.mro():
             handler = mapping.get(cls)
             if handler is not None:
-                return handler
-        return None
+                resolved = handler
+                break
+
+        cache[event_type] = resolved
+        return resolved
 
     # Event handlers -------------------------------------------------
 
     def handle_RoutePlanMessage(self, event: RoutePlanMessage) -> List[StreamMessage]:
-        route = event.content.route
+        config = ROUTE_CONFIGS.get(event.content.route, ROUTE_CONFIGS["deep_dive"])
         messages: List[StreamMessage] = []
 
-        if route == "quick_answer":
-            self._final_agent_sources = {"quick_answer_agent"}
-            end_description = (
-                "Quick answer selected – responding directly using existing knowledge."
-            )
-            self._answer_step_description = (
-                "Drafting a direct reply without additional research."
-            )
-        elif route == "coding":
-            self._final_agent_sources = {"coding_agent"}
-            end_description = (
-                "Coding support engaged – focusing on implementation guidance."
-            )
-            self._answer_step_description = (
-                "Producing code-focused explanations and solutions."
-            )
-            if not self._coding_step_open:
-                self._coding_step_open = True
-                messages.append(
-                    StepStartMessage(
-                        type="step.start",
-                        title="Coding agent thinking",
-                        description="Coding agent is thinking through the implementation details.",
-                    )
-                )
-        else:
-            self._final_agent_sources = {"report_agent"}
-            end_description = "Deep dive research selected – gathering sources for a comprehensive response."
-            self._answer_step_description = (
-                "Synthesizing findings from external research."
-            )
+        self._final_agent_sources = config.answer_sources
+        self._answer_step_description = config.answer_step_description
+        if config.opens_coding_step and not self._coding_step_open:
+            self._coding_step_open = True
+            messages.append(CODING_STEP_START)
 
         if self._planning_step_open:
-            messages.append(
-                StepEndMessage(
-                    type="step.end",
-                    title="Planning the appropriate route",
-                    description=end_description,
-                )
-            )
+            messages.append(config.planning_step_end)
             self._planning_step_open = False
 
         return messages
@@ -281,6 +491,7 @@ class EventProcessor:
         self, event: ResearchPlanMessage
     ) -> List[StreamMessage]:
         self._active_research_plan = event.content
+        self._url_flags = {}
 
         queries = [
             query.strip()
@@ -296,7 +507,7 @@ class EventProcessor:
 
         messages.extend(self._open_search_step(f"Searching for {query_text}."))
         messages.append(
-            StepStatusMessage(
+            StepStatusMessage.model_construct(
                 type="step.status",
                 title="Running web search",
                 description=f"Searching for {query_text}.",
@@ -320,7 +531,7 @@ class EventProcessor:
         messages.extend(self._ensure_rank_step_started())
 
         ranked_pages: List[Page] = []
-        seen_rank_urls: Set[str] = set()
+        url_flags = self._url_flags
         fetch_start_pages: List[Page] = []
         rank_limit: Optional[int] = None
         fetch_limit: Optional[int] = None
@@ -331,7 +542,8 @@ class EventProcessor:
 
         for item in event.content.selections:
             url = item.url.strip()
-            if not url or url in seen_rank_urls:
+            flags = url_flags.get(url, 0)
+            if not url or flags & URL_RANKED:
                 continue
 
             ranked_page = self._build_page(
@@ -343,19 +555,31 @@ class EventProcessor:
             if ranked_page is None:
                 continue
 
-            seen_rank_urls.add(url)
+            flags |= URL_RANKED
             if rank_limit is None or len(ranked_pages) < rank_limit:
                 ranked_pages.append(ranked_page)
 
-            if url not in self._fetch_announced and (
+            if not flags & URL_FETCH_ANNOUNCED and (
                 fetch_limit is None or len(fetch_start_pages) < fetch_limit
             ):
-                self._fetch_announced.add(url)
+                flags |= URL_FETCH_ANNOUNCED
                 fetch_start_pages.append(ranked_page)
 
+            url_flags[url] = flags
+
+            # Past both limits later selections can no longer be shown, so skip
+            # building (and validating) pages for them.
+            if (
+                rank_limit is not None
+                and fetch_limit is not None
+                and len(ranked_pages) >= rank_limit
+                and len(fetch_start_pages) >= fetch_limit
+            ):
+                break
+
         if not self._rank_step_completed:
             messages.append(
-                StepEndMessage(
+                StepEndMessage.model_construct(
                     type="step.end",
                     title="Ranking candidate sources",
                     description=f"Selected {len(ranked_pages)} pages for deeper research.",
@@ -365,7 +589,7 @@ class EventProcessor:
 
         if fetch_start_pages:
             messages.append(
-                StepFetchStartMessage(
+                StepFetchStartMessage.model_construct(
                     type="step.fetch.start",
                     title="Fetching supporting details",
                     pages=fetch_start_pages,
@@ -378,7 +602,7 @@ class EventProcessor:
         self, event: SearchResultMessage
     ) -> List[StreamMessage]:
         fetched_pages: List[Page] = []
-        seen_fetch_urls: Set[str] = set()
+        url_flags = self._url_flags
         fetch_limit: Optional[int] = None
 
         if self._active_research_plan is not None:
@@ -386,7 +610,8 @@ class EventProcessor:
 
         for result in event.content.results:
             url = result.url.strip()
-            if not url or url in seen_fetch_urls:
+            flags = url_flags.get(url, 0)
+            if not url or flags & URL_FETCHED:
                 continue
 
             detail = (result.detail_summary or result.snippet or "").strip()
@@ -399,7 +624,7 @@ class EventProcessor:
             if fetched_page is None:
                 continue
 
-            seen_fetch_urls.add(url)
+            url_flags[url] = flags | URL_FETCHED
             if fetch_limit == 0:
                 break
             if fetch_limit is None or len(fetched_pages) < fetch_limit:
@@ -409,7 +634,7 @@ class EventProcessor:
 
         self._latest_citation_pages = fetched_pages
         return [
-            StepFetchEndMessage(
+            StepFetchEndMessage.model_construct(
                 type="step.fetch.end",
                 title="Fetching supporting details",
                 pages=fetched_pages,
@@ -418,85 +643,57 @@ class EventProcessor:
 
     def handle_ModelClientStreamingChunkEvent(
         self, event: ModelClientStreamingChunkEvent
-    ) -> List[StreamMessage]:
-        if event.source not in self._final_agent_sources:
-            return []
-
+    ) -> Sequence[StreamMessage]:
         content = event.content or ""
         if not content:
-            return []
+            return NO_MESSAGES
 
-        messages: List[StreamMessage] = []
-        if self._coding_step_open:
-            messages.append(
-                StepEndMessage(
-                    type="step.end",
-                    title="Coding agent thinking",
-                    description="Coding approach finalized – composing response.",
-                )
-            )
-            self._coding_step_open = False
-
-        messages.extend(self._ensure_answer_step_started())
-        self._answer_chunks.append(content)
-        messages.append(
-            StepAnswerDeltaMessage(
-                type="step.answer.delta",
-                title="Answering the question",
-                delta=content,
+        if self._coding_step_open or not self._answer_step_started:
+            messages = self._close_coding_step()
+            messages.extend(self._ensure_answer_step_started())
+        else:
+            messages = []
+        self._answer_buffer.write(content)
+        self._pending_delta.append(content)
+        self._pending_delta_len += len(content)
+        if self._pending_delta_len >= ANSWER_DELTA_FLUSH_CHARS:
+            messages.extend(self._flush_answer_delta())
+            return messages
+
+        elapsed = time.monotonic() - self._last_delta_flush
+        if elapsed >= ANSWER_DELTA_FLUSH_INTERVAL:
+            messages.extend(self._flush_answer_delta())
+        elif self._flush_timer is None and self._request_flush is not None:
+            self._flush_timer = asyncio.get_running_loop().call_later(
+                ANSWER_DELTA_FLUSH_INTERVAL - elapsed, self._request_flush
             )
-        )
         return messages
 
     def handle_BaseTextChatMessage(
         self, event: BaseTextChatMessage
-    ) -> List[StreamMessage]:
+    ) -> Sequence[StreamMessage]:
         if event.source in self._final_agent_sources and event.content:
-            self._fallback_segments.append(event.content)
-        return []
+            self._fallback_buffer.write(event.content)
+        return NO_MESSAGES
 
     def handle_TaskResult(self, event: TaskResult) -> List[StreamMessage]:
-        messages: List[StreamMessage] = []
+        messages = self._close_coding_step()
 
-        if self._coding_step_open:
-            messages.append(
-                StepEndMessage(
-                    type="step.end",
-                    title="Coding agent thinking",
-                    description="Coding approach finalized – composing response.",
-                )
-            )
-            self._coding_step_open = False
-
-        final_answer = self._strip_termination_token("".join(self._answer_chunks))
-        if not final_answer and self._fallback_segments:
+        final_answer = self._strip_termination_token(self._answer_buffer.getvalue())
+        if not final_answer:
             final_answer = self._strip_termination_token(
-                "".join(self._fallback_segments)
+                self._fallback_buffer.getvalue()
             )
 
-        if not final_answer:
-            report_segments: List[str] = []
-            for message in event.messages:
-                if (
-                    isinstance(message, BaseTextChatMessage)
-                    and message.source in self._final_agent_sources
-                ):
-                    report_segments.append(message.content)
-            final_answer = self._strip_termination_token("".join(report_segments))
-
+        messages.extend(self._flush_answer_delta())
         messages.extend(self._ensure_answer_step_started())
 
         if not self._answer_step_completed:
-            messages.append(
-                StepAnswerEndMessage(
-                    type="step.answer.end",
-                    title="Answering the question",
-                )
-            )
+            messages.append(ANSWER_STEP_END)
             self._answer_step_completed = True
 
         messages.append(
-            AnswerMessage(
+            AnswerMessage.model_construct(
                 type="answer",
                 answer=final_answer,
                 citations=self._latest_citation_pages or None,
@@ -514,7 +711,7 @@ class EventProcessor:
 
         self._search_step_open = True
         return [
-            StepStartMessage(
+            StepStartMessage.model_construct(
                 type="step.start",
                 title="Running web search",
                 description=description,
@@ -527,7 +724,7 @@ class EventProcessor:
 
         self._search_step_open = False
         return [
-            StepEndMessage(
+            StepEndMessage.model_construct(
                 type="step.end",
                 title="Running web search",
                 description=description,
@@ -540,32 +737,58 @@ class EventProcessor:
 
         self._answer_step_started = True
         return [
-            StepAnswerStartMessage(
+            StepAnswerStartMessage.model_construct(
                 type="step.answer.start",
                 title="Answering the question",
                 description=self._answer_step_description,
             )
         ]
 
-    def _ensure_rank_step_started(self) -> List[StreamMessage]:
-        if self._rank_step_started:
+    def _close_coding_step(self) -> List[StreamMessage]:
+        if not self._coding_step_open:
             return []
 
-        self._rank_step_started = True
+        self._coding_step_open = False
+        return [CODING_STEP_END]
+
+    def _flush_answer_delta(self) -> List[StreamMessage]:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if not self._pending_delta:
+            return []
+
+        delta = "".join(self._pending_delta)
+        self._pending_delta = []
+        self._pending_delta_len = 0
+        self._last_delta_flush = time.monotonic()
         return [
-            StepStartMessage(
-                type="step.start",
-                title="Ranking candidate sources",
-                description="Prioritizing pages to review in depth.",
+            StepAnswerDeltaMessage.model_construct(
+                type="step.answer.delta",
+                title="Answering the question",
+                delta=delta,
             )
         ]
 
+    def _ensure_rank_step_started(self) -> List[StreamMessage]:
+        if self._rank_step_started:
+            return []
+
+        self._rank_step_started = True
+        return [RANK_STEP_START]
+
     @staticmethod
     def _strip_termination_token(text: str) -> str:
-        trimmed = text.rstrip()
-        if trimmed.endswith("TERMINATE"):
-            trimmed = trimmed[: -len("TERMINATE")].rstrip()
-        return trimmed
+        # Scan back over trailing whitespace and the sentinel with index math so
+        # the answer is sliced once instead of copied by each rstrip().
+        end = len(text)
+        while end and text[end - 1].isspace():
+            end -= 1
+        if text.endswith(TERMINATION_TOKEN, 0, end):
+            end -= len(TERMINATION_TOKEN)
+            while end and text[end - 1].isspace():
+                end -= 1
+        return text[:end]
 
     @staticmethod
     def _build_page(
@@ -576,18 +799,69 @@ class EventProcessor:
         favicon: Optional[str] = None,
         snippet_maxlen: Optional[int] = 100,
     ) -> Optional[Page]:
-        payload: Dict[str, Optional[str]] = {"url": url}
-        if title:
-            payload["title"] = title
-        if snippet:
-            payload["snippet"] = snippet[:snippet_maxlen] if snippet_maxlen else snippet
-        if favicon:
-            payload["favicon"] = favicon
+        # Every field is a plain string taken from agent output that was
+        # validated when the agent produced it, so skip pydantic validation.
+        if not url:
+            return None
+        if snippet and snippet_maxlen:
+            snippet = snippet[:snippet_maxlen]
+        return Page.model_construct(
+            url=url,
+            title=title or None,
+            snippet=snippet or None,
+            favicon=favicon or None,
+        )
+
+
+@dataclass
+class _StreamFailure:
+    error: Exception
+
+
+_STREAM_END = object()
+
+# Queued by EventProcessor's flush timer and passed through to it unchanged.
+FLUSH_DUE = object()
+
+
+def _queue_flush(queue: asyncio.Queue[object]) -> None:
+    # A full queue means the consumer is busy; the chunk handler's own deadline
+    # check flushes as those events are processed.
+    with contextlib.suppress(asyncio.QueueFull):
+        queue.put_nowait(FLUSH_DUE)
 
+
+async def _buffer_stream(
+    stream: AsyncIterator[object], queue: asyncio.Queue[object]
+) -> AsyncIterator[object]:
+    """Drain `stream` in a background task into the bounded `queue`.
+
+    The team keeps decoding model output while the consumer is busy writing to
+    a slow client; once the queue is full the producer waits. Errors raised by
+    the stream are re-raised to the consumer."""
+
+    async def produce() -> None:
         try:
-            return Page.model_validate(payload)
-        except ValidationError:
-            return None
+            async for item in stream:
+                await queue.put(item)
+        except Exception as err:
+            await queue.put(_StreamFailure(err))
+            return
+        await queue.put(_STREAM_END)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STREAM_END:
+                break
+            if isinstance(item, _StreamFailure):
+                raise item.error
+            yield item
+    finally:
+        producer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await producer
 
 
 async def ask(
@@ -600,11 +874,22 @@ async def ask(
         if session.conversation_id is None or session.state is None:
             return
 
-        stream = session.state.team.run_stream(task=user_message)
-        processor = EventProcessor(stream, session.conversation_id)
+        queue: asyncio.Queue[object] = asyncio.Queue(maxsize=STREAM_BUFFER_SIZE)
+        stream = _buffer_stream(session.state.team.run_stream(task=user_message), queue)
+        processor = EventProcessor(
+            stream,
+            session.conversation_id,
+            request_flush=functools.partial(_queue_flush, queue),
+        )
 
-        async for message in processor.run():
-            yield message
+        try:
+            # Closed explicitly so run() cancels its flush timer before the
+            # stream itself is closed.
+            async with contextlib.aclosing(processor.run()) as messages:
+                async for message in messages:
+                    yield message
+        finally:
+            await stream.aclose()
 
 
 # for manual testing
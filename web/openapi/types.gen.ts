@@ -108,7 +108,27 @@ export type ChatStreamEnvelope = {
     /**
      * Data
      */
-    data: TurnStartMessage | StepStartMessage | StepStatusMessage | StepEndMessage | StepFetchStartMessage | StepFetchEndMessage | StepAnswerStartMessage | StepAnswerDeltaMessage | StepAnswerEndMessage | AnswerMessage;
+    data: ({
+        type: 'turn.start';
+    } & TurnStartMessage) | ({
+        type: 'step.start';
+    } & StepStartMessage) | ({
+        type: 'step.status';
+    } & StepStatusMessage) | ({
+        type: 'step.end';
+    } & StepEndMessage) | ({
+        type: 'step.fetch.start';
+    } & StepFetchStartMessage) | ({
+        type: 'step.fetch.end';
+    } & StepFetchEndMessage) | ({
+        type: 'step.answer.start';
+    } & StepAnswerStartMessage) | ({
+        type: 'step.answer.delta';
+    } & StepAnswerDeltaMessage) | ({
+        type: 'step.answer.end';
+    } & StepAnswerEndMessage) | ({
+        type: 'answer';
+    } & AnswerMessage);
 };
 
 /**
@@ -179,16 +179,36 @@ export const zStepAnswerEndMessage = z.object({
 export const zChatStreamEnvelope = z.object({
     event: z.literal('message'),
     data: z.union([
-        zTurnStartMessage,
-        zStepStartMessage,
-        zStepStatusMessage,
-        zStepEndMessage,
-        zStepFetchStartMessage,
-        zStepFetchEndMessage,
-        zStepAnswerStartMessage,
-        zStepAnswerDeltaMessage,
-        zStepAnswerEndMessage,
-        zAnswerMessage
+        z.object({
+            type: z.literal('turn.start')
+        }).and(zTurnStartMessage),
+        z.object({
+            type: z.literal('step.start')
+        }).and(zStepStartMessage),
+        z.object({
+            type: z.literal('step.status')
+        }).and(zStepStatusMessage),
+        z.object({
+            type: z.literal('step.end')
+        }).and(zStepEndMessage),
+        z.object({
+            type: z.literal('step.fetch.start')
+        }).and(zStepFetchStartMessage),
+        z.object({
+            type: z.literal('step.fetch.end')
+        }).and(zStepFetchEndMessage),
+        z.object({
+            type: z.literal('step.answer.start')
+        }).and(zStepAnswerStartMessage),
+        z.object({
+            type: z.literal('step.answer.delta')
+        }).and(zStepAnswerDeltaMessage),
+        z.object({
+            type: z.literal('step.answer.end')
+        }).and(zStepAnswerEndMessage),
+        z.object({
+            type: z.literal('answer')
+        }).and(zAnswerMessage)
     ])
 });
 